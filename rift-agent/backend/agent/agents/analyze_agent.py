@@ -10,173 +10,364 @@ Responsibilities:
 
 from __future__ import annotations
 
+import os
+import queue
 import re
+import shutil
+import signal
 import subprocess
-from datetime import datetime, timezone
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, TYPE_CHECKING
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from agent.state import now_iso
 
 if TYPE_CHECKING:
     from agent.state import AgentState, FailureEvent
 
 ALLOWED_BUG_TYPES = {"LINTING", "SYNTAX", "LOGIC", "TYPE_ERROR", "IMPORT", "INDENTATION"}
 
+# Resolved once so the JS tooling can be exec'd directly, without a shell.
+_NPX = shutil.which("npx.cmd" if os.name == "nt" else "npx")
+_NPM = shutil.which("npm.cmd" if os.name == "nt" else "npm")
+
+# ---------------------------------------------------------------------------
+# Patterns (compiled once per process)
+# ---------------------------------------------------------------------------
+
+# Horizontal whitespace is spelled [ \t] so a match never runs past the end
+# of the line it started on. The streamed pytest/flake8 patterns are bytes
+# patterns: only the captured fields are ever decoded, not the whole log.
+
+# pytest output, one alternation so the buffer is scanned once:
+#   error branch: "src/utils.py:15: SyntaxError: ..."
+#   lint branch:  "src/utils.py:15:4: E302 ..." (ESLint / pylint style)
+_PYTEST_RE = re.compile(
+    rb"(?P<err_file>[^\s:]+\.py):(?P<err_line>\d+):[ \t]*(?P<etype>[A-Za-z]+Error|SyntaxError|IndentationError|ImportError|TypeError):[ \t]*(?P<err_msg>.+)"
+    rb"|(?P<lint_file>[^\s:]+\.py):(?P<lint_line>\d+):\d+:[ \t]*(?P<code>[A-Z]\d+)[ \t]+(?P<lint_msg>.+)"
+)
+# Jest: "● src/utils.js › test description\n  TypeError: ..."
+_JEST_BLOCK_RE = re.compile(
+    r"●\s+(?P<suite>.+?)\n.+?(?P<etype>TypeError|SyntaxError|ReferenceError|Error):\s+(?P<msg>.+)",
+    re.MULTILINE | re.DOTALL,
+)
+_JEST_LINE_RE = re.compile(r"at .+\((?P<file>[^:)]+):(?P<line>\d+):")
+# ESLint compact: "path/file.js: line 10, col 5, Error - message (rule)"
+_ESLINT_COMPACT_RE = re.compile(
+    r"(?P<file>[^:]+):\s+line (?P<line>\d+),\s+col \d+,\s+(?:Error|Warning)\s+-\s+(?P<msg>.+?)(?:\s+\(.+\))?$"
+)
+# flake8 with --format=%(path)s:%(row)d:%(col)d: %(code)s %(text)s
+_FLAKE8_RE = re.compile(
+    rb"(?P<file>[^:\n]+):(?P<line>\d+):\d+:[ \t]*(?P<code>[EWF]\d+)[ \t]+(?P<msg>.+)"
+)
+# Test summaries: pytest "5 passed, 2 failed" / Jest "Tests: 2 failed, 5 passed, 7 total"
+_PYTEST_PASSED_RE = re.compile(rb"(\d+) passed")
+_PYTEST_FAILED_RE = re.compile(rb"(\d+) failed")
+_JEST_SUMMARY_RE = re.compile(r"Tests:\s+(?:(\d+) failed,\s+)?(\d+) passed(?:,\s+(\d+) total)?")
+
 # ---------------------------------------------------------------------------
 # Parsers
 # ---------------------------------------------------------------------------
 
-def _parse_pytest_output(output: str, root: str) -> List["FailureEvent"]:
+class _Finding(NamedTuple):
+    """
+    Compact record emitted by the parsers. Linters can report thousands of
+    findings, so they stay tuples until deduplication and are only turned
+    into FailureEvent dicts for the survivors.
+    """
+    bug_type: str
+    file: str
+    line: int
+    message: str
+
+
+# Findings keyed by (bug_type, file, line); insertion order is report order
+_FindingMap = Dict[Tuple[str, str, int], _Finding]
+
+
+def _add_finding(out: _FindingMap, finding: _Finding) -> None:
+    """Record finding unless one with the same (bug_type, file, line) is already in out."""
+    out.setdefault(finding[:3], finding)
+
+
+def _text(raw: bytes) -> str:
+    """Decode a captured field of subprocess output."""
+    return raw.decode("utf-8", "replace")
+
+
+def _parse_pytest_line(line: bytes) -> Optional[_Finding]:
     """
-    Parse pytest's verbose / short test summary output.
+    Parse one line of pytest's verbose / short test summary output.
     Extracts: file, line, error category.
     """
-    failures: List[FailureEvent] = []
+    # Literal prefilter: both branches of _PYTEST_RE need ".py:", and an
+    # `in` test is far cheaper than running the regex on every line
+    if b".py:" not in line:
+        return None
+    m = _PYTEST_RE.search(line)
+    if m is None:
+        return None
+
+    err_file, err_line, etype, err_msg, lint_file, lint_line, code, lint_msg = m.groups()
+    if etype is not None:
+        return _Finding(
+            _classify_python_error(_text(etype).upper()),
+            _text(err_file),
+            int(err_line),
+            _text(err_msg.strip()),
+        )
+    return _Finding("LINTING", _text(lint_file), int(lint_line), _text(code + b" " + lint_msg.strip()))
 
-    # Pattern 1: "FAILED src/utils.py::test_foo - AssertionError"
-    # Pattern 2: "src/utils.py:15: SyntaxError: ..."
-    error_pattern = re.compile(
-        r"(?P<file>[^\s:]+\.py):(?P<line>\d+):\s*(?P<etype>[A-Za-z]+Error|SyntaxError|IndentationError|ImportError|TypeError):\s*(?P<msg>.+)"
-    )
-    # ESLint / pylint style: "src/utils.py:15:4: E302 ..."
-    lint_pattern = re.compile(
-        r"(?P<file>[^\s:]+\.py):(?P<line>\d+):\d+:\s*(?P<code>[A-Z]\d+)\s+(?P<msg>.+)"
-    )
 
-    for line in output.splitlines():
-        m = error_pattern.search(line)
-        if m:
-            etype = m.group("etype").upper()
-            bug_type = _classify_python_error(etype)
-            failures.append(
-                {
-                    "bug_type": bug_type,
-                    "file": m.group("file"),
-                    "line": int(m.group("line")),
-                    "message": m.group("msg").strip(),
-                }
-            )
-            continue
+def _parse_flake8_line(line: bytes) -> Optional[_Finding]:
+    """Parse one line of flake8 output (see the --format passed in _run_flake8)."""
+    m = _FLAKE8_RE.match(line)
+    if m is None:
+        return None
 
-        m = lint_pattern.search(line)
-        if m:
-            failures.append(
-                {
-                    "bug_type": "LINTING",
-                    "file": m.group("file"),
-                    "line": int(m.group("line")),
-                    "message": f"{m.group('code')} {m.group('msg').strip()}",
-                }
-            )
+    file, line_no, code, msg = m.groups()
+    return _Finding("LINTING", _text(file), int(line_no), _text(code + b" " + msg.strip()))
 
-    return failures
+
+_PY_ERR_MAP = {
+    "SYNTAXERROR": "SYNTAX",
+    "INDENTATIONERROR": "INDENTATION",
+    "IMPORTERROR": "IMPORT",
+    "MODULENOTFOUNDERROR": "IMPORT",
+    "TYPEERROR": "TYPE_ERROR",
+    "NAMEERROR": "LOGIC",
+    "ATTRIBUTEERROR": "LOGIC",
+}
 
 
 def _classify_python_error(etype: str) -> str:
-    mapping = {
-        "SYNTAXERROR": "SYNTAX",
-        "INDENTATIONERROR": "INDENTATION",
-        "IMPORTERROR": "IMPORT",
-        "MODULENOTFOUNDERROR": "IMPORT",
-        "TYPEERROR": "TYPE_ERROR",
-        "NAMEERROR": "LOGIC",
-        "ATTRIBUTEERROR": "LOGIC",
-    }
-    return mapping.get(etype.upper(), "LOGIC")
-
-
-def _parse_jest_output(output: str) -> List["FailureEvent"]:
-    """Parse Jest/ESLint JSON or text output."""
-    failures: List[FailureEvent] = []
-
-    # Pattern: "● src/utils.js › test description\n  TypeError: ..."
-    block_pattern = re.compile(
-        r"●\s+(?P<suite>.+?)\n.+?(?P<etype>TypeError|SyntaxError|ReferenceError|Error):\s+(?P<msg>.+)",
-        re.MULTILINE | re.DOTALL,
-    )
-    line_pattern = re.compile(r"at .+\((?P<file>[^:)]+):(?P<line>\d+):")
+    """Map an upper-cased Python exception name to a bug type."""
+    return _PY_ERR_MAP.get(etype, "LOGIC")
+
+
+def _parse_jest_output(output: str, out: _FindingMap) -> None:
+    """Parse Jest/ESLint JSON or text output into out."""
 
-    for block in block_pattern.finditer(output):
+    for block in _JEST_BLOCK_RE.finditer(output):
         etype = block.group("etype")
         msg = block.group("msg").strip()
         # try to find file/line in block
-        lm = line_pattern.search(block.group(0))
+        lm = _JEST_LINE_RE.search(block.group(0))
         file_n = lm.group("file") if lm else "unknown"
         line_n = int(lm.group("line")) if lm else 0
-        failures.append(
-            {
-                "bug_type": _classify_js_error(etype),
-                "file": file_n,
-                "line": line_n,
-                "message": msg,
-            }
-        )
+        _add_finding(out, _Finding(_classify_js_error(etype), file_n, line_n, msg))
+
 
-    return failures
+_JS_ERR_MAP = {
+    "TypeError": "TYPE_ERROR",
+    "SyntaxError": "SYNTAX",
+    "ReferenceError": "IMPORT",
+}
 
 
 def _classify_js_error(etype: str) -> str:
-    mapping = {
-        "TypeError": "TYPE_ERROR",
-        "SyntaxError": "SYNTAX",
-        "ReferenceError": "IMPORT",
-    }
-    return mapping.get(etype, "LOGIC")
+    return _JS_ERR_MAP.get(etype, "LOGIC")
 
 
-def _run_eslint(clone_path: str) -> List["FailureEvent"]:
-    """Run ESLint and parse results."""
-    failures: List[FailureEvent] = []
+def _has_js_files(language_counts: Optional[dict]) -> bool:
+    """True if clone detection saw any JS/TS sources (or did not record counts)."""
+    if language_counts is None:
+        return True
+    return language_counts.get("javascript", 0) + language_counts.get("typescript", 0) > 0
+
+
+def _run_eslint(clone_path: str, out: _FindingMap) -> None:
+    """Run ESLint and parse results into out."""
+    if _NPX is None:
+        return
     try:
         r = subprocess.run(
-            ["npx", "eslint", ".", "--format", "compact", "--no-eslintrc", "-c",
-             '{"rules":{"no-undef":"error","no-unused-vars":"warn"}}'],
+            [_NPX, "eslint", ".", "--format", "compact", "--no-eslintrc",
+             "--rule", "no-undef:error", "--rule", "no-unused-vars:warn"],
             cwd=clone_path,
             capture_output=True,
             text=True,
             timeout=60,
-            shell=True,  # Use shell on Windows
-        )
-        # compact: path/file.js: line 10, col 5, Error - message (rule)
-        pattern = re.compile(
-            r"(?P<file>[^:]+):\s+line (?P<line>\d+),\s+col \d+,\s+(?:Error|Warning)\s+-\s+(?P<msg>.+?)(?:\s+\(.+\))?$"
         )
         for line in r.stdout.splitlines():
-            m = pattern.match(line.strip())
+            # Literal prefilter: every compact-format finding has "line "
+            if "line " not in line:
+                continue
+            m = _ESLINT_COMPACT_RE.match(line.strip())
             if m:
-                failures.append(
-                    {
-                        "bug_type": "LINTING",
-                        "file": m.group("file").strip(),
-                        "line": int(m.group("line")),
-                        "message": m.group("msg").strip(),
-                    }
-                )
+                file, line_no, msg = m.groups()
+                _add_finding(out, _Finding("LINTING", file.strip(), int(line_no), msg.strip()))
     except Exception:
         pass
-    return failures
 
 
 # ---------------------------------------------------------------------------
 # Test runner
 # ---------------------------------------------------------------------------
 
-def _count_tests_in_output(output: str, language: str) -> tuple[int, int]:
-    """Return (total, passed) from test runner output."""
-    if language == "python":
-        # "5 passed, 2 failed"
-        m = re.search(r"(\d+) passed", output)
-        f = re.search(r"(\d+) failed", output)
-        passed = int(m.group(1)) if m else 0
-        failed = int(f.group(1)) if f else 0
-        return passed + failed, passed
-    else:
-        # Jest: "Tests: 2 failed, 5 passed, 7 total"
-        m = re.search(r"Tests:\s+(?:(\d+) failed,\s+)?(\d+) passed(?:,\s+(\d+) total)?", output)
-        if m:
-            failed = int(m.group(1) or 0)
-            passed = int(m.group(2) or 0)
-            total = int(m.group(3) or (passed + failed))
-            return total, passed
+# How often _stream_lines re-checks the child and deadline while its pipe is quiet
+_EXIT_POLL_SECONDS = 0.1
+# How long the pipe may stay idle after the child exits before whatever still
+# holds it (a server a test started) is treated as a leftover and killed
+_DRAIN_GRACE_SECONDS = 1.0
+# Lines buffered between the pipe reader and a slower parser; the reader
+# blocks when it is full, so memory stays bounded by this, not the log size
+_STREAM_QUEUE_LINES = 1024
+
+
+def _kill_tree(proc: subprocess.Popen) -> None:
+    """
+    Kill proc and everything it spawned. On POSIX the child leads its own
+    session, so killing the group also takes out grandchildren (servers, test
+    workers) that would otherwise keep the output pipe open.
+    """
+    if os.name == "nt":
+        if proc.poll() is None:
+            proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass  # whole group already gone
+
+
+def _stream_lines(cmd: list[str], cwd: str, timeout: float) -> Iterator[bytes]:
+    """
+    Run cmd and yield its merged stdout/stderr line by line as it is produced,
+    so callers parse while the child is still running and never hold the whole
+    output. Lines are raw bytes – nothing is decoded unless a parser matches.
+
+    timeout bounds the child: once it passes, the process tree is killed,
+    output already read is still yielded, and TimeoutExpired raised if the
+    child had not exited – even if a grandchild still holds the pipe. Once
+    the child has exited, leftovers (a server a test started) are killed
+    after the pipe has been idle for _DRAIN_GRACE_SECONDS. Every line read
+    is yielded however slowly the caller consumes them.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=os.name != "nt",
+    )
+    # Blocking pipe reads happen on a pump thread so this generator can wait
+    # against a deadline; None marks end of output.
+    lines: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=_STREAM_QUEUE_LINES)
+    stop = threading.Event()
+
+    def _put(item: Optional[bytes]) -> bool:
+        # Blocks while the queue is full, but gives up once the generator is done
+        while not stop.is_set():
+            try:
+                lines.put(item, timeout=_EXIT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _pump() -> None:
+        try:
+            with proc.stdout:
+                for line in proc.stdout:
+                    if not _put(line):
+                        return
+        finally:
+            _put(None)
+
+    threading.Thread(target=_pump, name="stream-lines", daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    killed = False
+    timed_out = False
+    try:
+        idle_since = time.monotonic()
+        while True:
+            if not killed and time.monotonic() >= deadline:
+                # Kill the writers, then drain what was already read
+                timed_out = proc.poll() is None
+                _kill_tree(proc)
+                killed = True
+            try:
+                line = lines.get(timeout=_EXIT_POLL_SECONDS)
+            except queue.Empty:
+                # Queue drained and the pipe quiet: only now can leftovers be cut off
+                if killed or (
+                    proc.poll() is not None
+                    and time.monotonic() - idle_since > _DRAIN_GRACE_SECONDS
+                ):
+                    break
+                continue
+            if line is None:
+                break
+            yield line
+            idle_since = time.monotonic()
+    finally:
+        stop.set()
+        # Also reaps anything the run left behind in its session
+        _kill_tree(proc)
+        proc.wait()
+
+    if timed_out:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+
+def _run_pytest(clone_path: str, out: _FindingMap) -> tuple[int, int]:
+    """Run pytest, collecting failures into out; returns (total, passed)."""
+    passed: Optional[int] = None
+    failed: Optional[int] = None
+    # Failure details only follow a "=== FAILURES ===" / "=== ERRORS ===" banner,
+    # so on a green run no line ever reaches the failure regex.
+    in_report = False
+
+    for line in _stream_lines(
+        ["python", "-m", "pytest", "--tb=short", "-v", clone_path], clone_path, 180
+    ):
+        if line.startswith(b"="):
+            # Section banners and the final "=== 5 passed, 2 failed in 0.4s ==="
+            if not in_report and (b"FAILURES" in line or b"ERRORS" in line):
+                in_report = True
+            if passed is None:
+                m = _PYTEST_PASSED_RE.search(line)
+                passed = int(m.group(1)) if m else None
+            if failed is None:
+                m = _PYTEST_FAILED_RE.search(line)
+                failed = int(m.group(1)) if m else None
+            continue
+
+        if in_report:
+            finding = _parse_pytest_line(line)
+            if finding is not None:
+                _add_finding(out, finding)
+
+    passed = passed or 0
+    return passed + (failed or 0), passed
+
+
+def _run_flake8(clone_path: str, out: _FindingMap) -> None:
+    """Run flake8, collecting its findings into out as LINTING failures."""
+    for line in _stream_lines(
+        ["python", "-m", "flake8", ".", "--max-line-length=120",
+         "--format=%(path)s:%(row)d:%(col)d: %(code)s %(text)s"],
+        clone_path,
+        60,
+    ):
+        finding = _parse_flake8_line(line)
+        if finding is not None:
+            _add_finding(out, finding)
+
+
+def _count_jest_tests(output: str) -> tuple[int, int]:
+    """Return (total, passed) from Jest output."""
+    # "Tests: 2 failed, 5 passed, 7 total"
+    m = _JEST_SUMMARY_RE.search(output)
+    if m:
+        failed = int(m.group(1) or 0)
+        passed = int(m.group(2) or 0)
+        total = int(m.group(3) or (passed + failed))
+        return total, passed
     return 0, 0
 
 
@@ -185,74 +376,53 @@ def analyze_agent(state: "AgentState") -> "AgentState":
 
     clone_path = state.get("clone_path", "")
     language = state.get("language", "python")
-    timeline = list(state.get("cicd_timeline", []))
 
     if not clone_path or state.get("status") == "failed":
-        return state
+        return {}
+
+    timeline: list = []
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "analysis_started",
             "detail": f"Running {language} tests in {clone_path}",
             "status": "running",
         }
     )
 
-    failures: List[FailureEvent] = []
+    findings: _FindingMap = {}
     raw_output = ""
     total_tests = 0
     tests_passed = 0
 
     try:
         if language == "python":
-            # Try pytest first
-            result = subprocess.run(
-                ["python", "-m", "pytest", "--tb=short", "-v", clone_path],
-                capture_output=True,
-                text=True,
-                timeout=180,
-                cwd=clone_path,
-            )
-            raw_output = result.stdout + result.stderr
-            failures = _parse_pytest_output(raw_output, clone_path)
-            total_tests, tests_passed = _count_tests_in_output(raw_output, language)
-
-            # Also run flake8 for linting
+            # pytest and flake8 are independent – run them side by side, each
+            # into its own map, and merge lint findings after the test ones
+            lint_findings: _FindingMap = {}
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                test_future = pool.submit(_run_pytest, clone_path, findings)
+                lint_future = pool.submit(_run_flake8, clone_path, lint_findings)
+
+            total_tests, tests_passed = test_future.result()
+
+            # flake8 is best-effort: a lint failure/timeout must not fail analysis
             try:
-                lint_result = subprocess.run(
-                    ["python", "-m", "flake8", ".", "--max-line-length=120",
-                     "--format=%(path)s:%(row)d:%(col)d: %(code)s %(text)s"],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                    cwd=clone_path,
-                )
-                lint_output = lint_result.stdout
-                lint_pattern = re.compile(
-                    r"(?P<file>[^:]+):(?P<line>\d+):\d+:\s*(?P<code>[EWF]\d+)\s+(?P<msg>.+)"
-                )
-                for line in lint_output.splitlines():
-                    m = lint_pattern.match(line)
-                    if m:
-                        failures.append(
-                            {
-                                "bug_type": "LINTING",
-                                "file": m.group("file"),
-                                "line": int(m.group("line")),
-                                "message": f"{m.group('code')} {m.group('msg').strip()}",
-                            }
-                        )
+                lint_future.result()
             except Exception:
                 pass
+            for finding in lint_findings.values():
+                _add_finding(findings, finding)
 
         else:
             # JavaScript / TypeScript
             # Check if package.json exists and has test script
             package_json = Path(clone_path) / "package.json"
+            has_package_json = package_json.exists()
             has_tests = False
             
-            if package_json.exists():
+            if has_package_json:
                 import json
                 try:
                     with open(package_json, 'r', encoding='utf-8') as f:
@@ -260,18 +430,10 @@ def analyze_agent(state: "AgentState") -> "AgentState":
                         scripts = pkg.get('scripts', {})
                         has_tests = 'test' in scripts
                         
-                        # Try to run npm test if available
-                        if has_tests:
-                            result = subprocess.run(
-                                ["npm", "test", "--", "--no-coverage", "--forceExit", "--passWithNoTests"],
-                                capture_output=True,
-                                text=True,
-                                timeout=60,  # Reduced timeout
-                                cwd=clone_path,
-                                shell=True,
-                            )
-                            raw_output = result.stdout + result.stderr
-                        else:
+                        if has_tests and _NPM is None:
+                            has_tests = False
+                            raw_output = "npm not found in PATH - skipping JavaScript tests"
+                        elif not has_tests:
                             # No test script, skip
                             raw_output = "No test script found in package.json"
                 except Exception as e:
@@ -279,29 +441,48 @@ def analyze_agent(state: "AgentState") -> "AgentState":
             else:
                 # No package.json, skip tests
                 raw_output = "No package.json found - skipping JavaScript tests"
+
+            # npm test and eslint are independent – run them side by side.
+            # Only run eslint if we have a package.json and something to lint
+            run_eslint = has_package_json and _has_js_files(state.get("language_counts"))
+            lint_findings = {}
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                test_future = pool.submit(
+                    subprocess.run,
+                    [_NPM, "test", "--", "--no-coverage", "--forceExit", "--passWithNoTests"],
+                    capture_output=True,
+                    text=True,
+                    timeout=60,  # Reduced timeout
+                    cwd=clone_path,
+                ) if has_tests else None
+                lint_future = pool.submit(_run_eslint, clone_path, lint_findings) if run_eslint else None
+
+            tests_green = False
+            if test_future is not None:
+                try:
+                    result = test_future.result()
+                    raw_output = result.stdout + result.stderr
+                    tests_green = result.returncode == 0
+                except Exception as e:
+                    raw_output = f"Error running npm test: {str(e)}"
             
-            failures = _parse_jest_output(raw_output) if has_tests else []
-            total_tests, tests_passed = _count_tests_in_output(raw_output, language) if has_tests else (0, 0)
+            if has_tests:
+                # Fast path: a green run has no "●" failure blocks to look for
+                if not tests_green and "●" in raw_output:
+                    _parse_jest_output(raw_output, findings)
+                total_tests, tests_passed = _count_jest_tests(raw_output)
             
-            # Only run eslint if we have a package.json
-            if package_json.exists():
-                failures += _run_eslint(clone_path)
-
-        tests_failed = len([f for f in failures if f])
-
-        # Deduplicate
-        seen = set()
-        deduped: List[FailureEvent] = []
-        for f in failures:
-            key = (f["bug_type"], f["file"], f["line"])
-            if key not in seen:
-                seen.add(key)
-                deduped.append(f)
-        failures = deduped
+            if lint_future is not None:
+                lint_future.result()
+            for finding in lint_findings.values():
+                _add_finding(findings, finding)
+
+        # Findings are already unique – materialise the state dicts
+        failures: List[FailureEvent] = [f._asdict() for f in findings.values()]
 
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "analysis_complete",
                 "detail": f"Found {len(failures)} failure(s). {tests_passed}/{total_tests} tests passed.",
                 "status": "success" if len(failures) == 0 else "failure",
@@ -309,7 +490,6 @@ def analyze_agent(state: "AgentState") -> "AgentState":
         )
 
         return {
-            **state,
             "failures": failures,
             "total_tests": total_tests,
             "tests_passed": tests_passed,
@@ -324,14 +504,13 @@ def analyze_agent(state: "AgentState") -> "AgentState":
         
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "analysis_error",
                 "detail": error_detail,
                 "status": "failure",
             }
         )
         return {
-            **state,
             "failures": [],
             "total_tests": 0,
             "tests_passed": 0,
@@ -9,13 +9,28 @@ Responsibilities:
 
 from __future__ import annotations
 
+import re
 import time
-from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
+from agent.state import now_iso
+
 if TYPE_CHECKING:
     from agent.state import AgentState
 
+# "https://github.com/owner/repo(.git)" or "git@github.com:owner/repo.git"
+_REPO_URL_RE = re.compile(r"github\.com[:/](?P<owner>[^/]+)/(?P<repo>[^/.]+)")
+
+# Workflow polling: 2s, 3s, 4.5s, ... capped at 30s, for at most 10 minutes
+POLL_TIMEOUT_SECONDS = 600
+POLL_INITIAL_INTERVAL = 2.0
+POLL_BACKOFF = 1.5
+POLL_MAX_INTERVAL = 30.0
+
+# Finding the run for our push: GitHub usually registers it within seconds
+RUN_LOOKUP_TIMEOUT_SECONDS = 6.0
+RUN_LOOKUP_INITIAL_INTERVAL = 1.0
+
 
 def cicd_agent(state: "AgentState") -> "AgentState":
     """LangGraph node: poll GitHub Actions and track CI/CD status."""
@@ -24,48 +39,61 @@ def cicd_agent(state: "AgentState") -> "AgentState":
     repo_url = state.get("repo_url", "")
     branch_name = state.get("branch_name", "")
     commit_sha = state.get("commit_sha", "")
-    timeline = list(state.get("cicd_timeline", []))
+    timeline: list = []
+
+    if github_token and not commit_sha:
+        # Nothing new was pushed (no changes, or the push failed), so there is
+        # no run that could turn the last real CI result into a pass
+        timeline.append(
+            {
+                "timestamp": now_iso(),
+                "event": "cicd_no_commit",
+                "detail": "No new commit pushed – nothing for CI/CD to verify",
+                "status": "failure",
+            }
+        )
+        return {
+            "cicd_status": "failure",
+            "cicd_timeline": timeline,
+        }
 
-    if not github_token or not commit_sha:
-        # No GitHub token/commit – simulate a local CI pass based on fix results
-        fixes = state.get("fixes", [])
-        applied = sum(1 for f in fixes if f.get("status") == "applied")
+    if not github_token:
+        # No GitHub token – simulate a local CI pass based on fix results
+        applied = state.get("applied_fixes", 0)
         ci_status = "success" if applied > 0 and len(state.get("failures", [])) > 0 else "failure"
 
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "cicd_simulated",
                 "detail": "No GitHub token provided – CI/CD result inferred from fix results",
                 "status": ci_status,
             }
         )
         return {
-            **state,
             "cicd_status": ci_status,
             "cicd_timeline": timeline,
         }
 
     # Parse owner/repo from URL
-    import re
-    m = re.search(r"github\.com[:/](?P<owner>[^/]+)/(?P<repo>[^/.]+)", repo_url)
+    m = _REPO_URL_RE.search(repo_url)
     if not m:
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "cicd_skipped",
                 "detail": "Cannot parse owner/repo from URL – skipping CI/CD polling",
                 "status": "pending",
             }
         )
-        return {**state, "cicd_status": "pending", "cicd_timeline": timeline}
+        return {"cicd_status": "pending", "cicd_timeline": timeline}
 
     owner = m.group("owner")
     repo = m.group("repo")
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "cicd_polling_started",
             "detail": f"Polling GitHub Actions for {owner}/{repo} on branch {branch_name}",
             "status": "running",
@@ -75,33 +103,45 @@ def cicd_agent(state: "AgentState") -> "AgentState":
     try:
         from github_integration import get_latest_workflow_run, get_workflow_status
 
-        # Wait briefly for GitHub to register the push
-        time.sleep(5)
-
-        run_id = get_latest_workflow_run(owner, repo, branch_name, github_token)
+        # Look the run up by commit as soon as GitHub registers the push,
+        # rather than sleeping a fixed 5s and taking whatever run is latest
+        lookup_deadline = time.monotonic() + RUN_LOOKUP_TIMEOUT_SECONDS
+        lookup_interval = RUN_LOOKUP_INITIAL_INTERVAL
+        while True:
+            run_id = get_latest_workflow_run(
+                owner, repo, branch_name, github_token, head_sha=commit_sha
+            )
+            if run_id or time.monotonic() >= lookup_deadline:
+                break
+            time.sleep(min(lookup_interval, max(0.0, lookup_deadline - time.monotonic())))
+            lookup_interval *= POLL_BACKOFF
         if not run_id:
             timeline.append(
                 {
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "timestamp": now_iso(),
                     "event": "cicd_no_workflow",
                     "detail": "No workflow run found – repository may not have GitHub Actions configured",
                     "status": "pending",
                 }
             )
-            return {**state, "cicd_status": "pending", "cicd_timeline": timeline}
+            return {"cicd_status": "pending", "cicd_timeline": timeline}
 
-        # Poll until complete (max 10 min)
-        max_polls = 60
-        poll_interval = 10  # seconds
+        # Poll until complete (max 10 min), backing off so quick runs are
+        # picked up fast and long ones cost fewer API requests
+        deadline = time.monotonic() + POLL_TIMEOUT_SECONDS
+        poll_interval = POLL_INITIAL_INTERVAL
         last_status = ""
+        etag = None
 
-        for _ in range(max_polls):
-            status, conclusion = get_workflow_status(owner, repo, run_id, github_token)
+        while time.monotonic() < deadline:
+            status, conclusion, etag = get_workflow_status(
+                owner, repo, run_id, github_token, etag=etag
+            )
 
-            if status != last_status:
+            if status is not None and status != last_status:
                 timeline.append(
                     {
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "timestamp": now_iso(),
                         "event": f"cicd_{status}",
                         "detail": f"Workflow run {run_id} – status: {status}"
                         + (f", conclusion: {conclusion}" if conclusion else ""),
@@ -115,31 +155,31 @@ def cicd_agent(state: "AgentState") -> "AgentState":
             if status == "completed":
                 final_status = "success" if conclusion == "success" else "failure"
                 return {
-                    **state,
                     "cicd_status": final_status,
                     "cicd_timeline": timeline,
                 }
 
-            time.sleep(poll_interval)
+            time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+            poll_interval = min(poll_interval * POLL_BACKOFF, POLL_MAX_INTERVAL)
 
         # Timed out
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "cicd_timeout",
                 "detail": "Polling timed out after 10 minutes",
                 "status": "failure",
             }
         )
-        return {**state, "cicd_status": "failure", "cicd_timeline": timeline}
+        return {"cicd_status": "failure", "cicd_timeline": timeline}
 
     except Exception as exc:
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "cicd_error",
                 "detail": str(exc),
                 "status": "failure",
             }
         )
-        return {**state, "cicd_status": "failure", "cicd_timeline": timeline}
+        return {"cicd_status": "failure", "cicd_timeline": timeline}
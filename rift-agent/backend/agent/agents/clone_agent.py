@@ -15,9 +15,10 @@ import shutil
 import subprocess
 import tempfile
 import time
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import Iterator, TYPE_CHECKING
+
+from agent.state import now_iso
 
 if TYPE_CHECKING:
     from agent.state import AgentState
@@ -27,26 +28,57 @@ if TYPE_CHECKING:
 # Language detection helpers
 # ---------------------------------------------------------------------------
 
-def _detect_language(repo_path: str) -> str:
-    root = Path(repo_path)
+# Directories that never hold first-party sources – pruned from the walk
+_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", "dist", "build", "venv", ".venv"})
+
+_EXT_LANGUAGE = {
+    ".py": "python",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".js": "javascript",
+    ".jsx": "javascript",
+}
+
+# Stop walking once one language has this many files and outnumbers the
+# runner-up by _DECISIVE_RATIO; re-checked every _DECISIVE_CHECK_EVERY files.
+_DECISIVE_MIN_FILES = 500
+_DECISIVE_RATIO = 10
+_DECISIVE_CHECK_EVERY = 256
+
+
+def _iter_file_names(path: str) -> Iterator[str]:
+    """Yield the names of all regular files under path (symlinks not followed)."""
+    with os.scandir(path) as it:
+        for entry in it:
+            # DirEntry caches d_type, so these checks need no extra stat()
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS:
+                    yield from _iter_file_names(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.name
+
+
+def _detect_language(repo_path: str) -> tuple[str, dict[str, int]]:
+    """Return (language, per-language source file counts) for the repo."""
     counts: dict[str, int] = {"python": 0, "typescript": 0, "javascript": 0}
 
-    for p in root.rglob("*"):
-        if not p.is_file():
-            continue
-        if p.suffix == ".py":
-            counts["python"] += 1
-        elif p.suffix == ".ts" or p.suffix == ".tsx":
-            counts["typescript"] += 1
-        elif p.suffix in (".js", ".jsx"):
-            counts["javascript"] += 1
+    for seen, name in enumerate(_iter_file_names(repo_path), 1):
+        dot = name.rfind(".")
+        language = _EXT_LANGUAGE.get(name[dot:]) if dot > 0 else None
+        if language is not None:
+            counts[language] += 1
+
+        if seen % _DECISIVE_CHECK_EVERY == 0:
+            top, runner_up = sorted(counts.values(), reverse=True)[:2]
+            if top > _DECISIVE_MIN_FILES and top > _DECISIVE_RATIO * runner_up:
+                break
 
     # Typescript takes precedence over plain JS
     if counts["typescript"] > 0 and counts["typescript"] >= counts["javascript"]:
-        return "typescript"
+        return "typescript", counts
     if counts["python"] >= counts["javascript"] and counts["python"] >= counts["typescript"]:
-        return "python" if counts["python"] > 0 else "javascript"
-    return "javascript"
+        return ("python" if counts["python"] > 0 else "javascript"), counts
+    return "javascript", counts
 
 
 # ---------------------------------------------------------------------------
@@ -58,7 +90,7 @@ def clone_agent(state: "AgentState") -> "AgentState":
 
     repo_url = state["repo_url"]
     github_token = state.get("github_token", "")
-    timeline = list(state.get("cicd_timeline", []))
+    timeline: list = []
 
     # Inject token into URL for private repos
     if github_token and "github.com" in repo_url:
@@ -78,7 +110,7 @@ def clone_agent(state: "AgentState") -> "AgentState":
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "clone_started",
             "detail": f"Cloning {state['repo_url']} into {tmp_dir}",
             "status": "running",
@@ -87,7 +119,7 @@ def clone_agent(state: "AgentState") -> "AgentState":
 
     try:
         result = subprocess.run(
-            ["git", "clone", "--depth", "1", repo_url, tmp_dir],
+            ["git", "clone", "--depth", "1", "--single-branch", "--no-tags", repo_url, tmp_dir],
             capture_output=True,
             text=True,
             timeout=120,
@@ -104,11 +136,11 @@ def clone_agent(state: "AgentState") -> "AgentState":
         if not Path(tmp_dir).exists():
             raise RuntimeError(f"Clone directory {tmp_dir} was not created")
 
-        language = _detect_language(tmp_dir)
+        language, language_counts = _detect_language(tmp_dir)
 
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "clone_success",
                 "detail": f"Repository cloned. Detected language: {language}",
                 "status": "success",
@@ -116,9 +148,9 @@ def clone_agent(state: "AgentState") -> "AgentState":
         )
 
         return {
-            **state,
             "clone_path": tmp_dir,
             "language": language,
+            "language_counts": language_counts,
             "cicd_timeline": timeline,
             "error_message": None,
         }
@@ -129,16 +161,16 @@ def clone_agent(state: "AgentState") -> "AgentState":
             shutil.rmtree(tmp_dir, ignore_errors=True)
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "clone_failed",
                 "detail": str(exc),
                 "status": "failure",
             }
         )
         return {
-            **state,
             "clone_path": "",
             "language": "unknown",
+            "language_counts": {},
             "cicd_timeline": timeline,
             "status": "failed",
             "error_message": str(exc),
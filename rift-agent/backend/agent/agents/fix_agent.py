@@ -10,58 +10,262 @@ Responsibilities:
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
+import json
 import os
 import re
+import shutil
+import sqlite3
 import textwrap
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from agent.state import now_iso
 
 if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
     from agent.state import AgentState, FailureEvent, FixRecord
 
+# Max LLM requests in flight at once (override with FIX_CONCURRENCY)
+FIX_CONCURRENCY = 8
+LLM_MODEL = "gpt-4o"
+LLM_MAX_RETRIES = 4
+# Lines of context sent on either side of a failing line
+CONTEXT_LINES = 10
+FIX_BATCH_MAX_TOKENS = 8192
+
+# On-disk cache of parsed LLM fixes (set FIX_CACHE_PATH="" to disable)
+FIX_CACHE_PATH = "~/.cache/rift-agent/fix_cache.sqlite"
+FIX_CACHE_TTL_SECONDS = 7 * 24 * 3600
+FIX_CACHE_MAX_ENTRIES = 5000
+
 
 # ---------------------------------------------------------------------------
 # OpenAI integration
 # ---------------------------------------------------------------------------
 
-def _call_llm(prompt: str, openai_key: str) -> str:
-    """Call OpenAI GPT-4o and return the assistant response text."""
-    try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=openai_key)
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert software engineer specializing in automated code repair. "
-                        "When given a code snippet and an error, you must:\n"
-                        "1. Provide a one-line fix description in the format: "
-                        "'remove the import statement' or 'add the colon at the correct position'\n"
-                        "2. Provide the corrected code ONLY (no explanation, no markdown fences).\n"
-                        "Return EXACTLY two sections separated by '---FIX_DESC---' and '---FIXED_CODE---'."
-                    ),
+# Kept byte-identical across calls so the provider can serve it from its prompt cache
+SYSTEM_PROMPT = (
+    "You are an expert software engineer specializing in automated code repair. "
+    "When given a code snippet and an error, you must:\n"
+    "1. Provide a one-line fix description in the format: "
+    "'remove the import statement' or 'add the colon at the correct position'\n"
+    "2. Provide the corrected code ONLY (no explanation, no markdown fences).\n"
+    "Return EXACTLY two sections separated by '---FIX_DESC---' and '---FIXED_CODE---'."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are an expert software engineer specializing in automated code repair. "
+    "You are given one source file's failing code hunks as JSON. Each hunk has its "
+    "start_line, the original code and the errors reported inside it. For EVERY hunk return:\n"
+    "1. start_line, copied from the hunk\n"
+    "2. fix_description: one line in the format "
+    "'remove the import statement' or 'add the colon at the correct position'\n"
+    "3. fixed_snippet: the corrected version of the hunk's code ONLY (no markdown fences)."
+)
+
+FIX_BATCH_SCHEMA = {
+    "name": "fix_batch",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "fixes": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "start_line": {"type": "integer"},
+                        "fix_description": {"type": "string"},
+                        "fixed_snippet": {"type": "string"},
+                    },
+                    "required": ["start_line", "fix_description", "fixed_snippet"],
+                    "additionalProperties": False,
                 },
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=1024,
-            temperature=0.1,
-        )
-        return response.choices[0].message.content or ""
-    except Exception as exc:
-        return f"---FIX_DESC---rule-based fix applied\n---FIXED_CODE---# LLM error: {exc}"
+            },
+        },
+        "required": ["fixes"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _make_client(openai_key: str) -> "Optional[AsyncOpenAI]":
+    """Build the async client shared by every LLM call of one fix_agent run."""
+    try:
+        from openai import AsyncOpenAI
+
+        # The client retries 429/5xx itself with exponential backoff
+        return AsyncOpenAI(api_key=openai_key, max_retries=LLM_MAX_RETRIES)
+    except Exception:
+        return None
+
+
+async def _call_llm(prompt: str, client: "Optional[AsyncOpenAI]", prompt_cache_key: str) -> str:
+    """Call OpenAI GPT-4o and return the assistant response text. Raises on API errors."""
+    if client is None:
+        raise RuntimeError("OpenAI client unavailable")
+
+    response = await client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=1024,
+        temperature=0.1,
+        extra_body={"prompt_cache_key": prompt_cache_key},
+    )
+    return response.choices[0].message.content or ""
+
+
+async def _call_llm_batch(
+    payload: str,
+    n_hunks: int,
+    client: "Optional[AsyncOpenAI]",
+    prompt_cache_key: str,
+) -> str:
+    """Ask for all of a file's fixes in one structured-output call; returns the raw JSON."""
+    if client is None:
+        raise RuntimeError("OpenAI client unavailable")
+
+    response = await client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": payload},
+        ],
+        max_tokens=min(1024 * n_hunks, FIX_BATCH_MAX_TOKENS),
+        temperature=0.1,
+        response_format={"type": "json_schema", "json_schema": FIX_BATCH_SCHEMA},
+        extra_body={"prompt_cache_key": prompt_cache_key},
+    )
+    return response.choices[0].message.content or ""
+
+
+# Dedented once at import; only the placeholders vary per failure
+_PROMPT_TEMPLATE = textwrap.dedent("""
+    Bug Type: {bug_type}
+    File: {file}
+    Line: {line}
+    Error Message: {message}
+
+    Code context (lines {start}-{end}):
+    ```
+    {context}
+    ```
+
+    Provide the fix description and the corrected version of ONLY the code context above.
+""")
+
+
+def _build_user_prompt(failure: "FailureEvent", context: str, start: int, end: int) -> str:
+    """The per-failure tail of the conversation; everything before it is shared."""
+    return _PROMPT_TEMPLATE.format(
+        bug_type=failure["bug_type"],
+        file=failure["file"],
+        line=failure["line"],
+        message=failure["message"],
+        start=start + 1,
+        end=end,
+        context=_printable(context),
+    )
 
 
 def _parse_llm_response(response: str) -> tuple[str, str]:
     """Split LLM response into (fix_description, fixed_code)."""
-    desc_match = re.search(r"---FIX_DESC---(.*?)(?=---FIXED_CODE---|$)", response, re.DOTALL)
-    code_match = re.search(r"---FIXED_CODE---(.*?)$", response, re.DOTALL)
-    fix_desc = desc_match.group(1).strip() if desc_match else "apply automated fix"
-    fixed_code = code_match.group(1).strip() if code_match else ""
-    return fix_desc, fixed_code
+    # The markers are literals – partition beats a regex scan
+    _, has_desc, rest = response.partition("---FIX_DESC---")
+    desc_part, _, code_part = (rest if has_desc else response).partition("---FIXED_CODE---")
+    fix_desc = (desc_part.strip() if has_desc else "") or "apply automated fix"
+    return fix_desc, code_part.strip()
+
+
+# ---------------------------------------------------------------------------
+# LLM response cache
+# ---------------------------------------------------------------------------
+
+def _normalize_context(context: str) -> str:
+    """Drop trailing whitespace and collapse blank-line runs so cosmetic edits still hit."""
+    stripped = "\n".join(line.rstrip() for line in context.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", stripped).strip("\n")
+
+
+def _cache_key(failure: "FailureEvent", context: str) -> str:
+    payload = json.dumps(
+        {
+            "m": LLM_MODEL,
+            "bt": failure["bug_type"],
+            "msg": failure["message"],
+            "ctx": _normalize_context(context),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _open_cache() -> Optional[sqlite3.Connection]:
+    """Open (creating if needed) the fix cache. Returns None if caching is unavailable."""
+    path = os.getenv("FIX_CACHE_PATH", FIX_CACHE_PATH)
+    if not path:
+        return None
+    try:
+        db_path = Path(path).expanduser()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v BLOB, ts INTEGER)")
+        return conn
+    except Exception:
+        return None
+
+
+def _cache_get(conn: Optional[sqlite3.Connection], key: str) -> Optional[tuple[str, str]]:
+    """Return a cached (fix_description, fixed_code), refreshing its LRU timestamp."""
+    if conn is None:
+        return None
+    try:
+        row = conn.execute("SELECT v, ts FROM kv WHERE k = ?", (key,)).fetchone()
+        now = int(time.time())
+        if row is None or row[1] < now - FIX_CACHE_TTL_SECONDS:
+            return None
+        conn.execute("UPDATE kv SET ts = ? WHERE k = ?", (now, key))
+        fix_desc, fixed_code = json.loads(row[0])
+        return fix_desc, fixed_code
+    except Exception:
+        return None
+
+
+def _cache_put(conn: Optional[sqlite3.Connection], key: str, fix_desc: str, fixed_code: str) -> None:
+    if conn is None:
+        return
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (k, v, ts) VALUES (?, ?, ?)",
+            (key, json.dumps([fix_desc, fixed_code]), int(time.time())),
+        )
+    except Exception:
+        pass
+
+
+def _close_cache(conn: Optional[sqlite3.Connection]) -> None:
+    """Evict expired and least-recently-used entries, then commit and close."""
+    if conn is None:
+        return
+    try:
+        conn.execute("DELETE FROM kv WHERE ts < ?", (int(time.time()) - FIX_CACHE_TTL_SECONDS,))
+        conn.execute(
+            "DELETE FROM kv WHERE k NOT IN (SELECT k FROM kv ORDER BY ts DESC LIMIT ?)",
+            (FIX_CACHE_MAX_ENTRIES,),
+        )
+        conn.commit()
+    except Exception:
+        pass
+    finally:
+        conn.close()
 
 
 # ---------------------------------------------------------------------------
@@ -84,7 +288,9 @@ def _rule_based_fix(failure: "FailureEvent", code_lines: List[str]) -> tuple[str
 
     if bug_type == "INDENTATION" and 0 <= line_idx < len(code_lines):
         fixed_lines = code_lines[:]
-        fixed_lines[line_idx] = re.sub(r"^\t+", lambda m: "    " * len(m.group()), code_lines[line_idx])
+        line = code_lines[line_idx]
+        body = line.lstrip("\t")
+        fixed_lines[line_idx] = "    " * (len(line) - len(body)) + body
         return "fix indentation to use 4 spaces consistently", fixed_lines
 
     if bug_type == "IMPORT" and 0 <= line_idx < len(code_lines):
@@ -100,107 +306,345 @@ def _rule_based_fix(failure: "FailureEvent", code_lines: List[str]) -> tuple[str
 # ---------------------------------------------------------------------------
 
 def _read_file_lines(filepath: str) -> List[str]:
-    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-        return f.readlines()
+    # Decode the raw bytes without newline translation, and with
+    # surrogateescape, so lines the fixes leave alone are written back
+    # byte-for-byte (CRLF endings and non-UTF-8 bytes included)
+    with open(filepath, "rb") as f:
+        text = f.read().decode("utf-8", "surrogateescape")
+    return io.StringIO(text, newline="").readlines()
+
+
+def _printable(text: str) -> str:
+    """File text made safe to send or serialise: undecodable bytes become U+FFFD."""
+    return text.encode("utf-8", "surrogateescape").decode("utf-8", "replace")
 
 
 def _write_file_lines(filepath: str, lines: List[str]) -> None:
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+    # One write of the joined text rather than a buffered write() per line,
+    # into a sibling temp file that is swapped in atomically – an interrupted
+    # run never leaves a half-written source file behind
+    tmp_path = f"{filepath}.rift-tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write("".join(lines).encode("utf-8", "surrogateescape"))
+        shutil.copymode(filepath, tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _build_file_index(clone_path: str) -> Dict[str, List[str]]:
+    """Map every file name in the clone to its paths, from a single directory walk."""
+    index: Dict[str, List[str]] = {}
+    for root, dirs, files in os.walk(clone_path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for name in files:
+            index.setdefault(name, []).append(os.path.join(root, name))
+    return index
+
+
+def _resolve_paths(clone_path: str, files: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Absolute path of each reported file. Files not found where reported are
+    looked up by name in a file index, built only if some lookup needs it.
+    """
+    paths: Dict[str, Optional[str]] = {}
+    index: Optional[Dict[str, List[str]]] = None
+    for file in files:
+        abs_path = Path(clone_path) / file
+        if abs_path.exists():
+            paths[file] = str(abs_path)
+            continue
+
+        if index is None:
+            index = _build_file_index(clone_path)
+        candidates = index.get(Path(file).name, [])
+        # Prefer a candidate that ends with the reported relative path
+        suffix = os.sep + os.path.normpath(file).lstrip(os.sep)
+        paths[file] = next(
+            (c for c in candidates if c.endswith(suffix)),
+            candidates[0] if candidates else None,
+        )
+    return paths
+
+
+def _context_window(line: int, n_lines: int) -> tuple[int, int]:
+    """0-based [start, end) slice of the lines sent to the LLM around a failing line."""
+    return max(0, line - CONTEXT_LINES - 1), min(n_lines, line + CONTEXT_LINES)
+
+
+def _snippet_lines(snippet: str) -> List[str]:
+    """Split replacement code into lines, keeping the hunk newline-terminated."""
+    lines = snippet.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    return lines
 
 
-def _apply_fix(
+async def _apply_fix(
     failure: "FailureEvent",
-    clone_path: str,
+    lines: List[str],
     openai_key: str,
+    client: "Optional[AsyncOpenAI]",
+    sem: asyncio.Semaphore,
+    cache: Optional[sqlite3.Connection],
+    prompt_cache_key: str,
 ) -> "FixRecord":
-    """Generate and apply one fix. Returns a FixRecord."""
-
-    abs_path = str(Path(clone_path) / failure["file"])
-    if not Path(abs_path).exists():
-        # Try finding the file relative to clone_path
-        candidates = list(Path(clone_path).rglob(Path(failure["file"]).name))
-        abs_path = str(candidates[0]) if candidates else abs_path
-
-    if not Path(abs_path).exists():
-        return {
-            "bug_type": failure["bug_type"],
-            "file": failure["file"],
-            "line": failure["line"],
-            "fix_description": "file not found – skipped",
-            "patch": "",
-            "status": "failed",
-        }
-
-    original_lines = _read_file_lines(abs_path)
+    """
+    Generate one fix and apply it to the caller's in-memory copy of the file
+    (writing is left to the caller). Returns a FixRecord.
+    """
+    original_lines = lines
 
     if openai_key and openai_key.startswith("sk-"):
         # Build context window (±10 lines around the error)
-        start = max(0, failure["line"] - 11)
-        end = min(len(original_lines), failure["line"] + 10)
+        start, end = _context_window(failure["line"], len(original_lines))
         context = "".join(original_lines[start:end])
-        prompt = textwrap.dedent(f"""
-            Bug Type: {failure["bug_type"]}
-            File: {failure["file"]}
-            Line: {failure["line"]}
-            Error Message: {failure["message"]}
-
-            Code context (lines {start+1}-{end}):
-            ```
-            {context}
-            ```
-
-            Provide the fix description and the corrected version of ONLY the code context above.
-        """)
-        llm_response = _call_llm(prompt, openai_key)
-        fix_desc, fixed_code = _parse_llm_response(llm_response)
+        prompt = _build_user_prompt(failure, context, start, end)
+        cache_key = _cache_key(failure, context)
+        cached = _cache_get(cache, cache_key)
+        if cached is not None:
+            fix_desc, fixed_code = cached
+        else:
+            try:
+                async with sem:
+                    llm_response = await _call_llm(prompt, client, prompt_cache_key)
+            except Exception:
+                # API error (e.g. a 429): no LLM code, fall through to the rule-based fix
+                fixed_code = ""
+            else:
+                fix_desc, fixed_code = _parse_llm_response(llm_response)
+                if fixed_code:
+                    _cache_put(cache, cache_key, fix_desc, fixed_code)
 
         if fixed_code:
-            # Replace the context window in original file
-            fixed_lines = list(original_lines)
-            replacement = fixed_code.splitlines(keepends=True)
-            fixed_lines[start:end] = replacement
-            try:
-                _write_file_lines(abs_path, fixed_lines)
-                return {
-                    "bug_type": failure["bug_type"],
-                    "file": failure["file"],
-                    "line": failure["line"],
-                    "fix_description": fix_desc,
-                    "patch": fixed_code,
-                    "status": "applied",
-                }
-            except Exception as exc:
-                return {
-                    "bug_type": failure["bug_type"],
-                    "file": failure["file"],
-                    "line": failure["line"],
-                    "fix_description": f"LLM fix write error: {exc}",
-                    "patch": "",
-                    "status": "failed",
-                }
+            # Replace the context window in the file
+            original_lines[start:end] = _snippet_lines(fixed_code)
+            return {
+                "bug_type": failure["bug_type"],
+                "file": failure["file"],
+                "line": failure["line"],
+                "fix_description": fix_desc,
+                "patch": fixed_code,
+                "status": "applied",
+            }
 
     # --- Fallback: rule-based ---
     fix_desc, fixed_lines = _rule_based_fix(failure, original_lines)
+    original_lines[:] = fixed_lines
+    return {
+        "bug_type": failure["bug_type"],
+        "file": failure["file"],
+        "line": failure["line"],
+        "fix_description": fix_desc,
+        "patch": _printable("".join(fixed_lines)),
+        "status": "applied",
+    }
+
+
+async def _apply_fix_batch(
+    failures: List["FailureEvent"],
+    abs_path: str,
+    original_lines: List[str],
+    client: "AsyncOpenAI",
+    sem: asyncio.Semaphore,
+    cache: Optional[sqlite3.Connection],
+    prompt_cache_key: str,
+) -> Optional[List["FixRecord"]]:
+    """
+    Fix all of one file's failures with a single LLM call and a single write.
+    Returns None (nothing written) when the caller should fall back to per-failure fixes.
+    """
+    # Merge overlapping context windows so every line belongs to at most one hunk
+    hunks: List[list] = []  # [start, end, failures]
+    for failure in sorted(failures, key=lambda f: f["line"]):
+        start, end = _context_window(failure["line"], len(original_lines))
+        if hunks and start < hunks[-1][1]:
+            hunks[-1][1] = max(hunks[-1][1], end)
+            hunks[-1][2].append(failure)
+        else:
+            hunks.append([start, end, [failure]])
+
+    resolved: Dict[int, tuple[str, str]] = {}
+    pending: List[dict] = []
+    cache_keys: Dict[int, str] = {}
+    for start, end, hunk_failures in hunks:
+        context = "".join(original_lines[start:end])
+        # A one-failure hunk shares its key with the per-failure path
+        key = _cache_key(
+            {
+                "bug_type": ",".join(f["bug_type"] for f in hunk_failures),
+                "message": "\n".join(f["message"] for f in hunk_failures),
+            },
+            context,
+        )
+        cached = _cache_get(cache, key)
+        if cached is not None:
+            resolved[start] = cached
+            continue
+        cache_keys[start] = key
+        pending.append(
+            {
+                "start_line": start + 1,
+                "end_line": end,
+                "code": _printable(context),
+                "errors": [
+                    {"line": f["line"], "bug_type": f["bug_type"], "message": f["message"]}
+                    for f in hunk_failures
+                ],
+            }
+        )
+
+    if pending:
+        payload = json.dumps({"file": failures[0]["file"], "hunks": pending})
+        try:
+            async with sem:
+                response = await _call_llm_batch(payload, len(pending), client, prompt_cache_key)
+            items = json.loads(response)["fixes"]
+        except Exception:
+            return None
+
+        for item in items:
+            start = item.get("start_line", 0) - 1
+            fixed_code = str(item.get("fixed_snippet", "")).strip()
+            if start in cache_keys and fixed_code:
+                fix_desc = str(item.get("fix_description", "")).strip() or "apply automated fix"
+                resolved[start] = (fix_desc, fixed_code)
+                _cache_put(cache, cache_keys[start], fix_desc, fixed_code)
+
+        if len(resolved) < len(hunks):
+            return None
+
+    # Splice bottom-up so earlier hunks keep their line numbers
+    fixed_lines = list(original_lines)
+    for start, end, _ in reversed(hunks):
+        fixed_lines[start:end] = _snippet_lines(resolved[start][1])
+
+    hunk_start = {id(f): start for start, _, hunk_failures in hunks for f in hunk_failures}
     try:
         _write_file_lines(abs_path, fixed_lines)
-        return {
-            "bug_type": failure["bug_type"],
-            "file": failure["file"],
-            "line": failure["line"],
-            "fix_description": fix_desc,
-            "patch": "".join(fixed_lines),
+    except Exception as exc:
+        return [
+            {
+                "bug_type": f["bug_type"],
+                "file": f["file"],
+                "line": f["line"],
+                "fix_description": f"LLM fix write error: {exc}",
+                "patch": "",
+                "status": "failed",
+            }
+            for f in failures
+        ]
+
+    return [
+        {
+            "bug_type": f["bug_type"],
+            "file": f["file"],
+            "line": f["line"],
+            "fix_description": resolved[hunk_start[id(f)]][0],
+            "patch": resolved[hunk_start[id(f)]][1],
             "status": "applied",
         }
+        for f in failures
+    ]
+
+
+async def _fix_file(
+    failures: List["FailureEvent"],
+    abs_path: Optional[str],
+    openai_key: str,
+    client: "Optional[AsyncOpenAI]",
+    sem: asyncio.Semaphore,
+    cache: Optional[sqlite3.Connection],
+    prompt_cache_key: str,
+) -> List["FixRecord"]:
+    """Apply all of one file's fixes with a single read and a single write."""
+    if abs_path is None:
+        return [
+            {
+                "bug_type": f["bug_type"],
+                "file": f["file"],
+                "line": f["line"],
+                "fix_description": "file not found – skipped",
+                "patch": "",
+                "status": "failed",
+            }
+            for f in failures
+        ]
+
+    # Read the file once; every fix below works on this copy
+    lines = _read_file_lines(abs_path)
+
+    if client is not None and len(failures) > 1:
+        fixes = await _apply_fix_batch(
+            failures, abs_path, lines, client, sem, cache, prompt_cache_key
+        )
+        if fixes is not None:
+            return fixes
+
+    # Work bottom-up so a fix that changes the line count cannot shift the
+    # lines of the fixes still to come
+    fixes: List["FixRecord"] = [None] * len(failures)  # type: ignore[list-item]
+    for idx in sorted(range(len(failures)), key=lambda i: failures[i]["line"], reverse=True):
+        fixes[idx] = await _apply_fix(
+            failures[idx], lines, openai_key, client, sem, cache, prompt_cache_key
+        )
+
+    try:
+        _write_file_lines(abs_path, lines)
     except Exception as exc:
-        return {
-            "bug_type": failure["bug_type"],
-            "file": failure["file"],
-            "line": failure["line"],
-            "fix_description": f"rule-based fix error: {exc}",
-            "patch": "",
-            "status": "failed",
-        }
+        for fix in fixes:
+            fix.update(fix_description=f"fix write error: {exc}", patch="", status="failed")
+    return fixes
+
+
+async def _apply_fixes(
+    failures: List["FailureEvent"],
+    clone_path: str,
+    openai_key: str,
+    concurrency: int,
+    run_id: str,
+) -> List["FixRecord"]:
+    """Fix all failures, with different files handled concurrently."""
+    paths = _resolve_paths(clone_path, list({f["file"]: None for f in failures}))
+    # Group by the resolved file, not the reported string: flake8 reports
+    # "./src/u.py" where pytest says "src/u.py", and two concurrent
+    # read-modify-write tasks on one file would drop each other's fixes.
+    # Unresolved files all land under None and are only reported as skipped.
+    by_path: Dict[Optional[str], List[int]] = {}
+    for idx, failure in enumerate(failures):
+        abs_path = paths[failure["file"]]
+        key = os.path.realpath(abs_path) if abs_path is not None else None
+        by_path.setdefault(key, []).append(idx)
+
+    sem = asyncio.Semaphore(concurrency)
+    use_llm = bool(openai_key and openai_key.startswith("sk-"))
+    client = _make_client(openai_key) if use_llm else None
+    cache = _open_cache() if use_llm else None
+    # Route every call of this run to the same provider-side prefix cache
+    prompt_cache_key = f"rift:{run_id}"
+    try:
+        results = await asyncio.gather(
+            *(
+                _fix_file(
+                    [failures[i] for i in idxs],
+                    abs_path, openai_key, client, sem, cache, prompt_cache_key,
+                )
+                for abs_path, idxs in by_path.items()
+            )
+        )
+    finally:
+        if client is not None:
+            await client.close()
+        _close_cache(cache)
+
+    # Put the records back in failure order
+    fixes: List["FixRecord"] = [None] * len(failures)  # type: ignore[list-item]
+    for idxs, records in zip(by_path.values(), results):
+        for idx, record in zip(idxs, records):
+            fixes[idx] = record
+    return fixes
 
 
 # ---------------------------------------------------------------------------
@@ -213,30 +657,53 @@ def fix_agent(state: "AgentState") -> "AgentState":
     failures = state.get("failures", [])
     clone_path = state.get("clone_path", "")
     openai_key = state.get("openai_key", "")
-    timeline = list(state.get("cicd_timeline", []))
 
     if not failures or state.get("status") == "failed":
-        return state
+        return {}
+
+    timeline: list = []
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "fix_started",
             "detail": f"Generating AI fixes for {len(failures)} failure(s)",
             "status": "running",
         }
     )
 
-    fixes: List[FixRecord] = []
-    for failure in failures:
-        fix = _apply_fix(failure, clone_path, openai_key)
-        fixes.append(fix)
+    # A failure already fixed in an earlier iteration came back, so that fix
+    # did not work: report the earlier record as "cached" instead of
+    # re-prompting and rewriting the file. Cached records write nothing and
+    # never count towards applied_fixes.
+    history = state.get("fix_history", [])
+    seen = {(f["file"], f["line"], f["bug_type"]): f for f in history}
+    fixes: List["FixRecord"] = [
+        {**seen[key], "status": "cached"} if key in seen else None
+        for key in ((f["file"], f["line"], f["bug_type"]) for f in failures)
+    ]
+    todo = [i for i, fix in enumerate(fixes) if fix is None]
+
+    if todo:
+        concurrency = max(1, int(os.getenv("FIX_CONCURRENCY", str(FIX_CONCURRENCY))))
+        new_fixes = asyncio.run(
+            _apply_fixes(
+                [failures[i] for i in todo],
+                clone_path,
+                openai_key,
+                concurrency,
+                state.get("run_id", ""),
+            )
+        )
+        for i, fix in zip(todo, new_fixes):
+            fixes[i] = fix
+        history = history + [f for f in new_fixes if f["status"] == "applied"]
 
     applied = sum(1 for f in fixes if f["status"] == "applied")
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "fix_complete",
             "detail": f"Applied {applied}/{len(fixes)} fix(es) successfully",
             "status": "success" if applied > 0 else "failure",
@@ -244,7 +711,8 @@ def fix_agent(state: "AgentState") -> "AgentState":
     )
 
     return {
-        **state,
         "fixes": fixes,
+        "fix_history": history,
+        "applied_fixes": applied,
         "cicd_timeline": timeline,
     }
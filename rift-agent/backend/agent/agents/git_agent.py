@@ -11,13 +11,17 @@ Responsibilities:
 from __future__ import annotations
 
 import subprocess
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from agent.state import now_iso
+
 if TYPE_CHECKING:
     from agent.state import AgentState
 
+# Commit identity, passed per-invocation with `git -c` instead of `git config`
+_GIT_IDENTITY = ["-c", "user.email=ai-agent@rift2026.dev", "-c", "user.name=RIFT AI Agent"]
+
 
 def _run_git(args: list[str], cwd: str, env: dict | None = None) -> tuple[int, str, str]:
     """Run a git command and return (returncode, stdout, stderr)."""
@@ -71,18 +75,21 @@ def git_agent(state: "AgentState") -> "AgentState":
     leader_name = state.get("leader_name", "LEADER")
     github_token = state.get("github_token", "")
     repo_url = state.get("repo_url", "")
-    fixes = state.get("fixes", [])
-    timeline = list(state.get("cicd_timeline", []))
+    # Only fixes written in this iteration; "cached" records change nothing
+    fixes = [f for f in state.get("fixes", []) if f.get("status") == "applied"]
 
     if not clone_path or state.get("status") == "failed":
-        return state
+        return {}
 
-    branch_name = _build_branch_name(team_name, leader_name)
+    timeline: list = []
+
+    # Precomputed by run_pipeline; rebuilt only if the node runs standalone
+    branch_name = state.get("branch_name") or _build_branch_name(team_name, leader_name)
     commit_message = _build_commit_message(fixes)
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "git_started",
             "detail": f"Creating branch: {branch_name}",
             "status": "running",
@@ -90,40 +97,33 @@ def git_agent(state: "AgentState") -> "AgentState":
     )
 
     try:
-        # Configure git identity
-        _run_git(["config", "user.email", "ai-agent@rift2026.dev"], clone_path)
-        _run_git(["config", "user.name", "RIFT AI Agent"], clone_path)
-
-        # Create or reset branch
-        rc, _, _ = _run_git(["checkout", "-b", branch_name], clone_path)
+        # Create or reset branch in one step; -B keeps the working-tree fixes
+        rc, _, err = _run_git(["checkout", "-B", branch_name], clone_path)
         if rc != 0:
-            # Branch exists – reset it
-            _run_git(["checkout", branch_name], clone_path)
-            _run_git(["reset", "--hard", "HEAD"], clone_path)
+            raise RuntimeError(f"git checkout failed: {err}")
 
         # Stage all changes
         _run_git(["add", "-A"], clone_path)
 
-        # Check if there's anything to commit
-        rc, status_out, _ = _run_git(["status", "--porcelain"], clone_path)
-        if not status_out.strip():
+        # Check if there's anything to commit (exit code 0 = nothing staged)
+        rc, _, _ = _run_git(["diff", "--cached", "--quiet"], clone_path)
+        if rc == 0:
             timeline.append(
                 {
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "timestamp": now_iso(),
                     "event": "git_nothing_to_commit",
                     "detail": "No file changes to commit",
                     "status": "success",
                 }
             )
             return {
-                **state,
                 "branch_name": branch_name,
                 "commit_sha": "",
                 "cicd_timeline": timeline,
             }
 
         # Commit
-        rc, out, err = _run_git(["commit", "-m", commit_message], clone_path)
+        rc, out, err = _run_git(_GIT_IDENTITY + ["commit", "-m", commit_message], clone_path)
         if rc != 0:
             raise RuntimeError(f"git commit failed: {err}")
 
@@ -148,7 +148,7 @@ def git_agent(state: "AgentState") -> "AgentState":
 
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "git_pushed",
                 "detail": f"Pushed {len(fixes)} fix(es) to branch {branch_name} (SHA: {commit_sha[:7]})",
                 "status": "success",
@@ -156,7 +156,6 @@ def git_agent(state: "AgentState") -> "AgentState":
         )
 
         return {
-            **state,
             "branch_name": branch_name,
             "commit_sha": commit_sha,
             "cicd_timeline": timeline,
@@ -165,14 +164,13 @@ def git_agent(state: "AgentState") -> "AgentState":
     except Exception as exc:
         timeline.append(
             {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now_iso(),
                 "event": "git_failed",
                 "detail": str(exc),
                 "status": "failure",
             }
         )
         return {
-            **state,
             "branch_name": branch_name,
             "commit_sha": "",
             "cicd_timeline": timeline,
@@ -17,9 +17,10 @@ Returns a ScoreBreakdown dict.
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
+from agent.state import now_iso
+
 if TYPE_CHECKING:
     from agent.state import AgentState, ScoreBreakdown
 
@@ -30,9 +31,8 @@ def score_agent(state: "AgentState") -> "AgentState":
     total_tests = state.get("total_tests", 0)
     tests_passed = state.get("tests_passed", 0)
     failures = state.get("failures", [])
-    fixes = state.get("fixes", [])
     cicd_status = state.get("cicd_status", "failure")
-    timeline = list(state.get("cicd_timeline", []))
+    timeline: list = []
     duration_seconds = state.get("duration_seconds", 0)
     retry_count = state.get("retry_count", 0)
 
@@ -50,7 +50,7 @@ def score_agent(state: "AgentState") -> "AgentState":
             tests_score = 0.0
 
     # --- Fix Quality component (max 40) ---
-    applied_fixes = sum(1 for f in fixes if f.get("status") == "applied")
+    applied_fixes = state.get("applied_fixes", 0)
     total_failures = len(failures)
     
     if total_failures > 0:
@@ -95,7 +95,7 @@ def score_agent(state: "AgentState") -> "AgentState":
 
     timeline.append(
         {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now_iso(),
             "event": "score_calculated",
             "detail": (
                 f"Score: {total_score}/110 | "
@@ -108,7 +108,6 @@ def score_agent(state: "AgentState") -> "AgentState":
     )
 
     return {
-        **state,
         "score": breakdown,
         "cicd_timeline": timeline,
         "status": "success" if total_score >= 50 else "partial",
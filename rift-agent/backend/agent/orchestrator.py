@@ -10,15 +10,15 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, List, Optional
 
 from langgraph.graph import END, StateGraph
 
-from agent.state import AgentState
+from agent.state import AgentState, CICDEvent
 from agent.agents.clone_agent import clone_agent
 from agent.agents.analyze_agent import analyze_agent
 from agent.agents.fix_agent import fix_agent
-from agent.agents.git_agent import git_agent
+from agent.agents.git_agent import _build_branch_name, git_agent
 from agent.agents.cicd_agent import cicd_agent
 from agent.agents.score_agent import score_agent
 
@@ -32,17 +32,12 @@ def should_retry(state: AgentState) -> str:
     After cicd_monitor: decide whether to retry the fix cycle.
     Re-runs analyze → fix → git → cicd if CI failed and retries remain.
     """
-    if state.get("status") == "failed":
+    if state["status"] == "failed" or state["cicd_status"] == "success" or state["retries_left"] <= 0:
         return "score"
 
-    retry_count = state.get("retry_count", 0)
-    retry_limit = state.get("retry_limit", 5)
-    cicd_status = state.get("cicd_status", "failure")
-
-    if cicd_status == "success":
-        return "score"
-
-    if retry_count >= retry_limit:
+    # Nothing new was fixed or committed: every failure came back and its
+    # earlier fix is cached, so another pass would just repeat this one
+    if not state.get("commit_sha") and state.get("applied_fixes", 0) == 0:
         return "score"
 
     return "analyze"  # retry
@@ -50,10 +45,12 @@ def should_retry(state: AgentState) -> str:
 
 def increment_retry(state: AgentState) -> AgentState:
     """Node injected between cicd→analyze in the retry path."""
+    retry_count = state.get("retry_count", 0) + 1
     return {
-        **state,
-        "retry_count": state.get("retry_count", 0) + 1,
+        "retry_count": retry_count,
+        "retries_left": state.get("retry_limit", 5) - retry_count,
         "fixes": [],  # reset fixes for next iteration
+        "applied_fixes": 0,
     }
 
 
@@ -107,8 +104,12 @@ def run_pipeline(
     openai_key: str,
     github_token: str = "",
     retry_limit: int = 5,
+    on_events: Optional[Callable[[List[CICDEvent]], None]] = None,
 ) -> AgentState:
-    """Execute the full CI/CD healing pipeline and return the final state."""
+    """
+    Execute the full CI/CD healing pipeline and return the final state.
+    on_events, if given, is called with each batch of new timeline events as nodes finish.
+    """
 
     graph = build_graph()
 
@@ -121,14 +122,17 @@ def run_pipeline(
         "github_token": github_token,
         "retry_limit": retry_limit,
         # Defaults
-        "branch_name": "",
+        "branch_name": _build_branch_name(team_name, leader_name),
         "clone_path": "",
         "language": "python",
+        "language_counts": {},
         "failures": [],
         "total_tests": 0,
         "tests_passed": 0,
         "tests_failed": 0,
         "fixes": [],
+        "applied_fixes": 0,
+        "fix_history": [],
         "commit_sha": "",
         "pr_url": "",
         "cicd_timeline": [],
@@ -141,6 +145,7 @@ def run_pipeline(
             "total_score": 0.0,
         },
         "retry_count": 0,
+        "retries_left": retry_limit,
         "status": "running",
         "error_message": None,
         "run_id": str(uuid.uuid4()),
@@ -152,7 +157,15 @@ def run_pipeline(
     import time
     start_time = time.time()
 
-    final_state = graph.invoke(initial_state)
+    # Stream state snapshots instead of invoke() so timeline events can be
+    # published while the run is still going; the last snapshot is the result
+    final_state = initial_state
+    published = 0
+    for final_state in graph.stream(initial_state, stream_mode="values"):
+        timeline = final_state.get("cicd_timeline", [])
+        if on_events is not None and len(timeline) > published:
+            on_events(timeline[published:])
+        published = len(timeline)
 
     elapsed = time.time() - start_time
     final_state["finished_at"] = datetime.now(timezone.utc).isoformat()
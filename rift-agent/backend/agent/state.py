@@ -4,7 +4,15 @@ Every node reads from and writes to this TypedDict.
 """
 
 from __future__ import annotations
-from typing import Any, List, Optional, TypedDict
+import operator
+import time
+from typing import Annotated, Any, List, Optional, TypedDict
+
+
+def now_iso() -> str:
+    """UTC timestamp for timeline events, e.g. "2026-02-19T10:15:42+00:00"."""
+    # time.strftime on a struct_time is a single C call – no datetime object
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
 
 
 class FailureEvent(TypedDict):
@@ -22,7 +30,7 @@ class FixRecord(TypedDict):
     line: int
     fix_description: str   # human-readable, e.g. "remove the import statement"
     patch: str             # unified diff patch applied to disk
-    status: str            # "applied" | "failed"
+    status: str            # "applied" | "failed" | "cached" (earlier fix reused, nothing written)
 
 
 class CICDEvent(TypedDict):
@@ -57,6 +65,7 @@ class AgentState(TypedDict):
     branch_name: str          # e.g. RIFT_ORGANISERS_SAIYAM_KUMAR_AI_Fix
     clone_path: str           # local temp directory
     language: str             # "python" | "javascript" | "typescript"
+    language_counts: dict     # source files seen per language during detection
 
     # --- Analysis ---
     failures: List[FailureEvent]
@@ -66,13 +75,17 @@ class AgentState(TypedDict):
 
     # --- Fixes ---
     fixes: List[FixRecord]
+    applied_fixes: int        # fixes with status "applied" in this iteration
+    fix_history: List[FixRecord]  # applied fixes from every iteration (kept across retries)
 
     # --- Git ---
     commit_sha: str
     pr_url: str
 
     # --- CI/CD ---
-    cicd_timeline: List[CICDEvent]
+    # Reducer: LangGraph concatenates each node's returned list onto the
+    # existing timeline, so nodes return only the events they added
+    cicd_timeline: Annotated[List[CICDEvent], operator.add]
     cicd_status: str          # "pending" | "running" | "success" | "failure"
 
     # --- Score ---
@@ -80,6 +93,7 @@ class AgentState(TypedDict):
 
     # --- Control ---
     retry_count: int
+    retries_left: int         # retry_limit - retry_count, kept by increment_retry
     status: str               # "running" | "success" | "failed" | "partial"
     error_message: Optional[str]
 
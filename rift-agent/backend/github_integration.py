@@ -5,40 +5,80 @@ GitHub API integration helpers.
 from __future__ import annotations
 
 import httpx
+import orjson
 
-GITHUB_API = "https://api.github.com"
+try:  # h2 comes with httpx[http2] (requirements.txt); fall back to HTTP/1.1 without it
+    import h2  # noqa: F401
 
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
-def _headers(token: str) -> dict:
-    return {
-        "Authorization": f"Bearer {token}",
+GITHUB_API = "https://api.github.com"
+
+# Shared client so repeated calls (notably CI polling) reuse one keep-alive
+# connection instead of paying TCP + TLS setup per request. The static
+# headers live on the client; only the token varies per call.
+_CLIENT = httpx.Client(
+    http2=_HTTP2,
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+    headers={
         "Accept": "application/vnd.github+json",
         "X-GitHub-Api-Version": "2022-11-28",
-    }
+    },
+)
+
+
+def _headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
 
 
-def get_latest_workflow_run(owner: str, repo: str, branch: str, token: str) -> str | None:
-    """Return the ID of the most recent workflow run on the given branch."""
+def get_latest_workflow_run(
+    owner: str,
+    repo: str,
+    branch: str,
+    token: str,
+    head_sha: str | None = None,
+) -> str | None:
+    """Return the ID of the most recent workflow run on the given branch (and commit, if given)."""
     url = f"{GITHUB_API}/repos/{owner}/{repo}/actions/runs"
     params = {"branch": branch, "per_page": 1}
+    if head_sha:
+        params["head_sha"] = head_sha
 
-    with httpx.Client(timeout=30) as client:
-        r = client.get(url, headers=_headers(token), params=params)
-        r.raise_for_status()
-        data = r.json()
-        runs = data.get("workflow_runs", [])
-        return str(runs[0]["id"]) if runs else None
+    r = _CLIENT.get(url, headers=_headers(token), params=params)
+    r.raise_for_status()
+    data = r.json()
+    runs = data.get("workflow_runs", [])
+    return str(runs[0]["id"]) if runs else None
 
 
-def get_workflow_status(owner: str, repo: str, run_id: str, token: str) -> tuple[str, str | None]:
-    """Return (status, conclusion) for a workflow run."""
+def get_workflow_status(
+    owner: str,
+    repo: str,
+    run_id: str,
+    token: str,
+    etag: str | None = None,
+) -> tuple[str | None, str | None, str | None]:
+    """
+    Return (status, conclusion, etag) for a workflow run.
+
+    Pass the etag from the previous call to make a conditional request: if the
+    run is unchanged GitHub answers 304 (no body, no rate-limit cost) and
+    status/conclusion come back as None with the same etag.
+    """
     url = f"{GITHUB_API}/repos/{owner}/{repo}/actions/runs/{run_id}"
+    headers = _headers(token)
+    if etag:
+        headers["If-None-Match"] = etag
 
-    with httpx.Client(timeout=30) as client:
-        r = client.get(url, headers=_headers(token))
-        r.raise_for_status()
-        data = r.json()
-        return data.get("status", "unknown"), data.get("conclusion")
+    r = _CLIENT.get(url, headers=headers)
+    if r.status_code == 304:
+        return None, None, etag
+    r.raise_for_status()
+    data = r.json()
+    return data.get("status", "unknown"), data.get("conclusion"), r.headers.get("ETag")
 
 
 def create_pr(
@@ -59,7 +99,10 @@ def create_pr(
         "base": base,
     }
 
-    with httpx.Client(timeout=30) as client:
-        r = client.post(url, headers=_headers(token), json=payload)
-        r.raise_for_status()
-        return r.json().get("html_url", "")
+    r = _CLIENT.post(
+        url,
+        content=orjson.dumps(payload),
+        headers={**_headers(token), "Content-Type": "application/json"},
+    )
+    r.raise_for_status()
+    return r.json().get("html_url", "")
@@ -5,22 +5,27 @@ Endpoints:
   POST /api/run-agent   – Start the agent pipeline
   GET  /api/results     – Get the latest results.json
   GET  /api/status      – Get current pipeline status
+  GET  /api/timeline    – Get the live CI/CD timeline
+  GET  /api/timeline/stream – Live CI/CD timeline as Server-Sent Events
   GET  /health          – Health check
+  GET  /healthz         – Liveness probe (static body)
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
 import os
 import threading
 import time
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import orjson
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, HttpUrl
 
 from agent.orchestrator import run_pipeline
 from results import write_results, RESULTS_PATH
@@ -36,12 +41,20 @@ app = FastAPI(
     docs_url="/docs",
 )
 
+# Explicit lists: no wildcard handling on the preflight path, and "*" with
+# allow_credentials=True is invalid per the CORS spec anyway
+_CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=_CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # ---------------------------------------------------------------------------
@@ -53,15 +66,44 @@ _pipeline_state: dict = {
     "run_id": None,
     "data": None,
     "error": None,
+    # Encoded results.json of the finished run, served as-is by /api/results
+    "results_json": None,
+    # Timeline events published by the pipeline as nodes finish
+    "timeline": [],
+    # Bumped by every /api/run-agent and /api/reset. A pipeline task only
+    # touches the state while it still owns the generation it was queued
+    # with, so a run orphaned by a reset can neither swallow the next run's
+    # start nor overwrite its status, timeline or results.
+    "generation": 0,
 }
+# A threading.Lock rather than an asyncio.Lock: the pipeline runs in a worker
+# thread and updates this state too. Critical sections are a few dict
+# operations, so async handlers never hold up the event loop on it.
 _pipeline_lock = threading.Lock()
 
+# A queued run counts as busy too, or a second request slips in before the first starts
+_BUSY_STATUSES = frozenset({"queued", "running"})
+
+# How often an SSE stream checks for new timeline events (in-process, no I/O)
+_SSE_POLL_SECONDS = 0.5
+
+# Runs are long (minutes) and one-at-a-time: give them their own worker thread
+# instead of holding a slot in Starlette's shared request threadpool
+_pipeline_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline")
+
+# Health probes are hit several times a second: keep the constant parts prebuilt
+_HEALTH_BASE = {"status": "ok", "service": "RIFT CI/CD Healing Agent"}
+_HEALTHZ_BODY = orjson.dumps({"status": "ok"})
+
 
 # ---------------------------------------------------------------------------
 # Request / Response models
 # ---------------------------------------------------------------------------
 
 class RunAgentRequest(BaseModel):
+    # Immutable, strict about unknown keys, whitespace stripped in pydantic-core
+    model_config = ConfigDict(frozen=True, extra="forbid", str_strip_whitespace=True)
+
     repo_url: str
     team_name: str = "RIFT_TEAM"
     leader_name: str = "LEADER"
@@ -81,11 +123,19 @@ class StatusResponse(BaseModel):
 # Background task
 # ---------------------------------------------------------------------------
 
-def _run_pipeline_task(request: RunAgentRequest) -> None:
-    """Execute the LangGraph pipeline in a background thread."""
-    global _pipeline_state
+def _publish_events(generation: int, events: list) -> None:
+    """Called from the pipeline thread with each batch of new timeline events."""
+    with _pipeline_lock:
+        if _pipeline_state["generation"] == generation:
+            _pipeline_state["timeline"].extend(events)
+
 
+def _run_pipeline_task(request: RunAgentRequest, generation: int) -> None:
+    """Execute the LangGraph pipeline in a background thread."""
     with _pipeline_lock:
+        # A reset or newer run since queueing cancels this one
+        if _pipeline_state["generation"] != generation:
+            return
         _pipeline_state["status"] = "running"
         _pipeline_state["error"] = None
 
@@ -97,16 +147,25 @@ def _run_pipeline_task(request: RunAgentRequest) -> None:
             openai_key=request.openai_key,
             github_token=request.github_token,
             retry_limit=request.retry_limit,
+            on_events=functools.partial(_publish_events, generation),
         )
-        write_results(final_state)
+        with _pipeline_lock:
+            if _pipeline_state["generation"] != generation:
+                return  # reset while running: results are no longer wanted
+        results_json = write_results(final_state)
 
         with _pipeline_lock:
+            if _pipeline_state["generation"] != generation:
+                return
             _pipeline_state["status"] = final_state.get("status", "unknown")
             _pipeline_state["run_id"] = final_state.get("run_id")
             _pipeline_state["data"] = final_state
+            _pipeline_state["results_json"] = results_json
 
     except Exception as exc:
         with _pipeline_lock:
+            if _pipeline_state["generation"] != generation:
+                return
             _pipeline_state["status"] = "failed"
             _pipeline_state["error"] = str(exc)
 
@@ -116,17 +175,25 @@ def _run_pipeline_task(request: RunAgentRequest) -> None:
 # ---------------------------------------------------------------------------
 
 @app.get("/health")
-def health():
-    return {"status": "ok", "service": "RIFT CI/CD Healing Agent", "timestamp": datetime.now(timezone.utc).isoformat()}
+async def health():
+    # UNIX timestamp: far cheaper than building and ISO-formatting a datetime
+    return Response(
+        content=orjson.dumps({**_HEALTH_BASE, "timestamp": time.time()}),
+        media_type="application/json",
+    )
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: static, pre-encoded body."""
+    return Response(content=_HEALTHZ_BODY, media_type="application/json")
 
 
 @app.post("/api/run-agent")
-def run_agent(request: RunAgentRequest, background_tasks: BackgroundTasks):
+async def run_agent(request: RunAgentRequest):
     """Trigger the autonomous healing pipeline."""
-    global _pipeline_state
-
     with _pipeline_lock:
-        if _pipeline_state["status"] == "running":
+        if _pipeline_state["status"] in _BUSY_STATUSES:
             raise HTTPException(
                 status_code=409,
                 detail="Pipeline is already running. Wait for it to complete.",
@@ -135,8 +202,12 @@ def run_agent(request: RunAgentRequest, background_tasks: BackgroundTasks):
         _pipeline_state["run_id"] = None
         _pipeline_state["data"] = None
         _pipeline_state["error"] = None
+        _pipeline_state["results_json"] = None
+        _pipeline_state["timeline"] = []
+        _pipeline_state["generation"] += 1
+        generation = _pipeline_state["generation"]
 
-    background_tasks.add_task(_run_pipeline_task, request)
+    _pipeline_executor.submit(_run_pipeline_task, request, generation)
 
     return {
         "message": "Pipeline started successfully",
@@ -145,62 +216,130 @@ def run_agent(request: RunAgentRequest, background_tasks: BackgroundTasks):
     }
 
 
-@app.get("/api/status")
-def get_status() -> StatusResponse:
+# StatusResponse only documents the schema: returning pre-encoded bytes
+# skips per-poll model construction, validation and re-encoding
+@app.get("/api/status", responses={200: {"model": StatusResponse}})
+async def get_status() -> Response:
     """Get current pipeline execution status."""
+    # Read just the fields we return – no copy of the whole state
     with _pipeline_lock:
-        state = _pipeline_state.copy()
-
-    data = state.get("data") or {}
-    return StatusResponse(
-        status=state["status"],
-        run_id=state.get("run_id"),
-        started_at=data.get("started_at"),
-        message=state.get("error") or f"Pipeline is {state['status']}",
+        status = _pipeline_state["status"]
+        run_id = _pipeline_state["run_id"]
+        error = _pipeline_state["error"]
+        started_at = (_pipeline_state["data"] or {}).get("started_at")
+
+    return Response(
+        content=orjson.dumps({
+            "status": status,
+            "run_id": run_id,
+            "started_at": started_at,
+            "message": error or f"Pipeline is {status}",
+        }),
+        media_type="application/json",
     )
 
 
 @app.get("/api/results")
-def get_results():
-    """Return the latest results.json."""
+async def get_results(pretty: bool = False):
+    """Return the latest results.json (compact; ``?pretty=1`` to indent)."""
     with _pipeline_lock:
-        if _pipeline_state["data"]:
-            return _pipeline_state["data"]
+        cached = _pipeline_state["results_json"]
+    if cached is None and RESULTS_PATH.is_file():
+        if not pretty:
+            # Results of an earlier server process: stream the file as-is
+            # (sendfile where available) instead of parsing and re-encoding it
+            return FileResponse(RESULTS_PATH, media_type="application/json")
+        cached = await asyncio.to_thread(RESULTS_PATH.read_bytes)
 
-    if RESULTS_PATH.exists():
-        with open(RESULTS_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="No results available yet. Run the agent first.")
 
-    raise HTTPException(status_code=404, detail="No results available yet. Run the agent first.")
+    # Already encoded when the run finished – only re-encoded for the debug view
+    if pretty:
+        cached = orjson.dumps(orjson.loads(cached), option=orjson.OPT_INDENT_2)
+    return Response(content=cached, media_type="application/json")
 
 
 @app.get("/api/timeline")
-def get_timeline():
+async def get_timeline():
     """Return just the CI/CD timeline for live updates."""
     with _pipeline_lock:
-        data = _pipeline_state.get("data") or {}
-        status = _pipeline_state.get("status", "idle")
+        # Copied: the pipeline thread may append while the response is encoded
+        timeline = list(_pipeline_state["timeline"])
+        status = _pipeline_state["status"]
 
     return {
         "status": status,
-        "timeline": data.get("cicd_timeline", []),
+        "timeline": timeline,
     }
 
 
+@app.get("/api/timeline/stream")
+async def stream_timeline(request: Request):
+    """
+    Push CI/CD timeline events as Server-Sent Events until the run finishes.
+    Each event's id is its timeline index, so a reconnecting EventSource
+    resumes after Last-Event-ID instead of replaying the whole timeline.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    start = int(last_id) + 1 if last_id.isdigit() else 0
+
+    async def events():
+        sent = start
+        while True:
+            with _pipeline_lock:
+                new_events = _pipeline_state["timeline"][sent:]
+                status = _pipeline_state["status"]
+
+            for event in new_events:
+                yield b"id: %d\ndata: %s\n\n" % (sent, orjson.dumps(event))
+                sent += 1
+
+            # Events are all published before the final status is set
+            if status not in _BUSY_STATUSES:
+                yield b"event: end\ndata: %s\n\n" % orjson.dumps({"status": status})
+                return
+
+            await asyncio.sleep(_SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/reset")
-def reset_pipeline():
+async def reset_pipeline():
     """Reset the pipeline state to idle."""
-    global _pipeline_state
-    
+    # Mutate in place – the dict is module state shared with the worker thread.
+    # A run still in flight keeps going in the background but, with its
+    # generation superseded, never writes to this state again.
     with _pipeline_lock:
-        _pipeline_state = {
-            "status": "idle",
-            "run_id": None,
-            "data": None,
-            "error": None,
-        }
-    
+        _pipeline_state.update(
+            status="idle", run_id=None, data=None, error=None, results_json=None, timeline=[]
+        )
+        _pipeline_state["generation"] += 1
+
     return {
         "message": "Pipeline reset successfully",
         "status": "idle",
     }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Exactly one worker: _pipeline_state, its lock and the pipeline executor
+    # are per-process, so extra workers would each see a different pipeline.
+    # "auto" picks uvloop + httptools (shipped with uvicorn[standard]) when
+    # available and falls back cleanly where they are not (e.g. Windows).
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=1,
+        loop="auto",
+        http="auto",
+        log_level=os.getenv("LOG_LEVEL", "info"),
+    )
@@ -0,0 +1,65 @@
+"""
+Tests for analyze_agent's subprocess streaming.
+"""
+
+import os
+import subprocess
+import time
+
+import pytest
+
+from agent.agents.analyze_agent import _stream_lines
+
+posix_only = pytest.mark.skipif(os.name == "nt", reason="uses sh and process groups")
+
+
+@posix_only
+def test_timeout_bounds_run_when_child_blocks():
+    start = time.monotonic()
+    lines = []
+    with pytest.raises(subprocess.TimeoutExpired):
+        for line in _stream_lines(["sh", "-c", "echo start; sleep 30"], ".", 1):
+            lines.append(line)
+
+    assert lines == [b"start\n"]
+    assert time.monotonic() - start < 5
+
+
+@posix_only
+def test_timeout_bounds_run_when_grandchild_holds_pipe(tmp_path):
+    # The grandchild inherits stdout and outlives the timeout
+    survived = tmp_path / "survived"
+    cmd = ["sh", "-c", f"(sleep 2; touch {survived}) & echo start; wait"]
+
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        list(_stream_lines(cmd, str(tmp_path), 1))
+    assert time.monotonic() - start < 2
+
+    # The whole process group was killed, not just the direct child
+    time.sleep(2)
+    assert not survived.exists()
+
+
+@posix_only
+def test_leftover_background_process_does_not_stall_finished_run(tmp_path):
+    start = time.monotonic()
+    lines = list(_stream_lines(["sh", "-c", "echo a; (sleep 30 &); echo b"], str(tmp_path), 30))
+
+    assert lines == [b"a\n", b"b\n"]
+    assert time.monotonic() - start < 5
+
+
+@posix_only
+def test_slow_consumer_gets_every_line_after_child_exits(tmp_path):
+    # The child finishes long before the caller is done parsing; the summary
+    # line at the very end must still arrive
+    cmd = ["sh", "-c", "i=0; while [ $i -lt 3000 ]; do echo line $i; i=$((i+1)); done; echo '=== 3 passed ==='"]
+
+    lines = []
+    for line in _stream_lines(cmd, str(tmp_path), 30):
+        lines.append(line)
+        time.sleep(0.001)  # ~3s of parsing, well past the drain grace
+
+    assert len(lines) == 3001
+    assert lines[-1] == b"=== 3 passed ===\n"
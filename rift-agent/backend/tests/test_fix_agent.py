@@ -0,0 +1,28 @@
+"""
+Tests for fix_agent's per-file grouping.
+"""
+
+import asyncio
+
+from agent.agents import fix_agent
+
+
+def test_same_file_reported_under_two_paths_gets_one_writer(tmp_path, monkeypatch):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "u.py").write_text("x = 1\n")
+    calls = []
+
+    async def fake_fix_file(failures, abs_path, *args):
+        calls.append((abs_path, [f["file"] for f in failures]))
+        return [{"file": f["file"], "line": f["line"], "status": "applied"} for f in failures]
+
+    monkeypatch.setattr(fix_agent, "_fix_file", fake_fix_file)
+    failures = [
+        {"file": "src/u.py", "line": 5, "bug_type": "LOGIC"},      # pytest style
+        {"file": "./src/u.py", "line": 50, "bug_type": "LINTING"},  # flake8 style
+    ]
+
+    fixes = asyncio.run(fix_agent._apply_fixes(failures, str(tmp_path), "", 2, "run"))
+
+    assert calls == [(str((tmp_path / "src" / "u.py").resolve()), ["src/u.py", "./src/u.py"])]
+    assert [f["line"] for f in fixes] == [5, 50]
@@ -36,6 +36,11 @@ export async function fetchTimeline() {
     return data
 }
 
+/** GET /api/timeline/stream – Live timeline pushed as Server-Sent Events */
+export function openTimelineStream() {
+    return new EventSource(`${BASE}/api/timeline/stream`)
+}
+
 /** GET /health */
 export async function checkHealth() {
     const { data } = await api.get('/health')
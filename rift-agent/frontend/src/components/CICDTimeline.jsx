@@ -1,6 +1,6 @@
 import React, { useEffect, useRef, useState } from 'react'
 import useAgentStore from '../store/agentStore'
-import { fetchTimeline } from '../api/agentApi'
+import { openTimelineStream } from '../api/agentApi'
 
 const EVENT_META = {
     clone_started: { icon: '📦', color: 'var(--accent-cyan)', label: 'Clone Started' },
@@ -45,7 +45,7 @@ export default function CICDTimeline() {
 
     const isRunning = status === 'running' || status === 'queued'
 
-    // Use live polling while running, results when done
+    // Use the live event stream while running, results when done
     const timeline =
         results?.cicd_timeline?.length > 0
             ? results.cicd_timeline
@@ -53,13 +53,17 @@ export default function CICDTimeline() {
 
     useEffect(() => {
         if (!isRunning) return
-        const id = setInterval(async () => {
+        setLiveEvents([])
+        const source = openTimelineStream()
+        source.onmessage = (e) => {
             try {
-                const data = await fetchTimeline()
-                setLiveEvents(data.timeline || [])
+                const event = JSON.parse(e.data)
+                setLiveEvents((prev) => [...prev, event])
             } catch { /* silently ignore */ }
-        }, 2000)
-        return () => clearInterval(id)
+        }
+        // Server closes the stream once the run finishes – don't reconnect
+        source.addEventListener('end', () => source.close())
+        return () => source.close()
     }, [isRunning])
 
     useEffect(() => {
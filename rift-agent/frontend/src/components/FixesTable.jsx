@@ -25,6 +25,7 @@ function BugPill({ type }) {
 
 function StatusDot({ status }) {
     if (status === 'applied') return <span style={{ color: 'var(--accent-green)', fontSize: '0.8rem' }}>✔ Applied</span>
+    if (status === 'cached') return <span style={{ color: 'var(--accent-yellow)', fontSize: '0.8rem' }}>↻ Reused</span>
     return <span style={{ color: 'var(--accent-red)', fontSize: '0.8rem' }}>✖ Failed</span>
 }
 